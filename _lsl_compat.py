@@ -0,0 +1,15 @@
+"""
+pylsl Compatibility
+-------------------
+Imports the pylsl names used by the scripts in one place. StreamInlet,
+resolve_streams() and resolve_byprop() are exported by every supported pylsl
+version; the deprecated resolve_stream() is not, so nothing here relies on it.
+"""
+
+import sys
+
+try:
+    from pylsl import StreamInlet, cf_string, resolve_byprop, resolve_streams
+except ImportError:
+    print("Error importing pylsl. Please install with: pip install pylsl")
+    sys.exit(1)
@@ -0,0 +1,81 @@
+"""
+LSL Stream Cache
+----------------
+Remembers the last LSL stream that was found so the next launch can look it
+up directly instead of waiting for a full network-wide discovery.
+"""
+
+import json
+import os
+import time
+
+from _lsl_compat import resolve_byprop
+
+CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "tello_emg", "last_stream.json")
+CACHE_TTL = 3600  # Seconds before a cached stream is considered stale
+
+
+def save_stream(info):
+    """Write the identifying fields of a StreamInfo to the cache file."""
+    entry = {
+        "name": info.name(),
+        "type": info.type(),
+        "source_id": info.source_id(),
+        "hostname": info.hostname(),
+        "channel_count": info.channel_count(),
+        "uid": info.uid(),
+        "saved_at": time.time(),
+    }
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        with open(CACHE_PATH, "w") as f:
+            json.dump(entry, f, indent=2)
+    except OSError as e:
+        print(f"Could not write stream cache: {e}")
+
+
+def load_stream():
+    """Return the cached stream entry, or None if missing, unreadable or expired."""
+    try:
+        with open(CACHE_PATH) as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    # Treat anything we didn't write ourselves as a cache miss
+    if not isinstance(entry, dict):
+        return None
+    saved_at = entry.get("saved_at")
+    if isinstance(saved_at, bool) or not isinstance(saved_at, (int, float)):
+        return None
+    # A timestamp from the future would otherwise never expire
+    if not 0 <= time.time() - saved_at <= CACHE_TTL:
+        return None
+    return entry
+
+
+def resolve_cached(timeout=0.5):
+    """Resolve the cached stream directly. Returns a (possibly empty) list of StreamInfo."""
+    entry = load_stream()
+    if not entry:
+        return []
+
+    # source_id survives a restart of the OpenBCI GUI stream, the uid doesn't
+    if entry.get("source_id"):
+        prop, value = "source_id", str(entry["source_id"])
+    elif entry.get("name"):
+        prop, value = "name", str(entry["name"])
+    else:
+        return []
+    print(f"Looking for cached stream ({prop} = '{value}')...")
+    streams = resolve_byprop(prop, value, timeout=timeout)
+
+    # source_id isn't unique across devices (and may be absent), so only
+    # accept streams that still look like the one we cached
+    return [info for info in streams if _matches(info, entry)]
+
+
+def _matches(info, entry):
+    """Return True if a StreamInfo has the name, type and channel count stored in entry."""
+    return (entry.get("name") == info.name() and entry.get("type") == info.type()
+            and entry.get("channel_count") == info.channel_count())
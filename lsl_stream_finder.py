@@ -6,41 +6,38 @@ Use this to troubleshoot LSL connection issues.
 """
 
 import time
+
 print("Importing pylsl...")
+from _lsl_compat import resolve_byprop, resolve_streams
 
-try:
-    from pylsl import StreamInlet, resolve_stream
-    print("Using standard pylsl import pattern")
-    resolve_function = resolve_stream
-except ImportError:
-    try:
-        from pylsl import StreamInlet
-        from pylsl.pylsl import resolve_byprop as resolve_stream
-        print("Using older pylsl import pattern")
-        resolve_function = resolve_stream
-    except ImportError:
-        try:
-            from pylsl import StreamInlet
-            from pylsl import resolve_byprop as resolve_stream
-            print("Using alternative pylsl import pattern")
-            resolve_function = resolve_stream
-        except ImportError:
-            print("Failed to import pylsl. Please install with: pip install pylsl")
-            exit(1)
+# Imported after _lsl_compat, which it relies on for pylsl
+import lsl_stream_cache
 
 print("\nLooking for ANY available LSL streams (10 second timeout)...")
 print("(Please make sure OpenBCI GUI is streaming data via LSL)")
 
+def print_matches(streams, description):
+    """Print the streams found by one of the lookups below."""
+    if streams:
+        print(f"Found {len(streams)} {description}:")
+        for i, stream in enumerate(streams):
+            try:
+                print(f"  [{i}] Name: '{stream.name()}', Type: '{stream.type()}'")
+            except Exception as e:
+                print(f"  [{i}] Error getting stream info: {e}")
+    else:
+        print(f"No {description} found.")
+
 try:
     # Try to find all streams
     print("\n--- Method 1: resolve_streams() ---")
+    streams_all = []
     try:
-        from pylsl import resolve_streams
         print("Calling resolve_streams()...")
-        streams = resolve_streams(wait_time =10.0)
-        if streams:
-            print(f"Found {len(streams)} streams:")
-            for i, stream in enumerate(streams):
+        streams_all = resolve_streams(wait_time =10.0)
+        if streams_all:
+            print(f"Found {len(streams_all)} streams:")
+            for i, stream in enumerate(streams_all):
                 try:
                     name = stream.name()
                     stream_type = stream.type()
@@ -49,59 +46,50 @@ try:
                     print(f"  [{i}] Name: '{name}', Type: '{stream_type}', ID: '{source_id}', Channels: {channel_count}")
                 except Exception as e:
                     print(f"  [{i}] Error getting stream info: {e}")
+            
+            # Let tello_emg_control.py connect to the first stream without a full discovery
+            lsl_stream_cache.save_stream(streams_all[0])
         else:
             print("No streams found with resolve_streams().")
     except Exception as e:
         print(f"Method 1 failed: {e}")
 
-    # Try to find EMGJoystick streams specifically
-    print("\n--- Method 2: resolve_stream('type', 'EMGJoystick') ---")
-    try:
-        streams = resolve_function('type', 'EMGJoystick', timeout=5.0)
-        if streams:
-            print(f"Found {len(streams)} EMGJoystick streams:")
-            for i, stream in enumerate(streams):
-                try:
-                    print(f"  [{i}] Name: '{stream.name()}', Type: '{stream.type()}'")
-                except Exception as e:
-                    print(f"  [{i}] Error getting stream info: {e}")
-        else:
-            print("No EMGJoystick streams found.")
-    except Exception as e:
-        print(f"Method 2 failed: {e}")
+    if streams_all:
+        # resolve_streams() already returned every stream on the network, and
+        # asking the resolver again by property wouldn't find any new ones (it
+        # only narrows the list), so just filter what we have
+        print("\n--- Method 2: type == 'EMGJoystick' ---")
+        print_matches([s for s in streams_all if s.type() == 'EMGJoystick'], "EMGJoystick streams")
 
-    # Try to find all EMG streams
-    print("\n--- Method 3: resolve_stream('type', 'EMG') ---")
-    try:
-        streams = resolve_function('type', 'EMG', timeout=5.0)
-        if streams:
-            print(f"Found {len(streams)} EMG streams:")
-            for i, stream in enumerate(streams):
-                try:
-                    print(f"  [{i}] Name: '{stream.name()}', Type: '{stream.type()}'")
-                except Exception as e:
-                    print(f"  [{i}] Error getting stream info: {e}")
-        else:
-            print("No EMG streams found.")
-    except Exception as e:
-        print(f"Method 3 failed: {e}")
+        print("\n--- Method 3: type == 'EMG' ---")
+        print_matches([s for s in streams_all if s.type() == 'EMG'], "EMG streams")
 
-    # Try to find streams by name containing "obci"
-    print("\n--- Method 4: resolve_stream('name', '*obci*') ---")
-    try:
-        from pylsl import resolve_byprop
-        streams = resolve_byprop('name', 'obci', timeout=5.0)
-        if streams:
-            print(f"Found {len(streams)} streams with 'obci' in name:")
-            for i, stream in enumerate(streams):
-                try:
-                    print(f"  [{i}] Name: '{stream.name()}', Type: '{stream.type()}'")
-                except Exception as e:
-                    print(f"  [{i}] Error getting stream info: {e}")
-        else:
-            print("No streams found with 'obci' in name.")
-    except Exception as e:
-        print(f"Method 4 failed: {e}")
+        print("\n--- Method 4: 'obci' in name ---")
+        print_matches([s for s in streams_all if 'obci' in s.name().lower()], "streams with 'obci' in name")
+    else:
+        # Nothing answered the general query; fall back to targeted lookups
+        # in case a stream only came up after it finished
+
+        # Try to find EMGJoystick streams specifically
+        print("\n--- Method 2: resolve_byprop('type', 'EMGJoystick') ---")
+        try:
+            print_matches(resolve_byprop('type', 'EMGJoystick', timeout=5.0), "EMGJoystick streams")
+        except Exception as e:
+            print(f"Method 2 failed: {e}")
+
+        # Try to find all EMG streams
+        print("\n--- Method 3: resolve_byprop('type', 'EMG') ---")
+        try:
+            print_matches(resolve_byprop('type', 'EMG', timeout=5.0), "EMG streams")
+        except Exception as e:
+            print(f"Method 3 failed: {e}")
+
+        # Try to find streams named "obci"
+        print("\n--- Method 4: resolve_byprop('name', 'obci') ---")
+        try:
+            print_matches(resolve_byprop('name', 'obci', timeout=5.0), "streams named 'obci'")
+        except Exception as e:
+            print(f"Method 4 failed: {e}")
 
 except Exception as e:
     print(f"Error during stream detection: {e}")
@@ -12,50 +12,78 @@ Control scheme:
 - EMG signals control forward/backward movement when airborne
 """
 
+import os
 import time
 import numpy as np
-from threading import Thread
+from threading import Event, RLock, Thread
 import sys
 
 # Use pygame for keyboard control instead of the keyboard module
 # This doesn't require root access on Linux
 import pygame
 
-try:
-    # Import pylsl directly from examples (which we know works)
-    from pylsl.examples import ReceiveData
-    print("Using pylsl from examples")
-    
-    # Import whatever works
-    try:
-        from pylsl import StreamInlet, resolve_stream
-        print("Using standard pylsl import")
-    except ImportError:
-        try:
-            from pylsl import StreamInlet
-            from pylsl import resolve_byprop
-            print("Using alternative pylsl import")
-        except ImportError:
-            print("Error importing pylsl. Using direct connection method only.")
-except ImportError:
-    print("Could not import pylsl.examples. Using standard imports.")
-    try:
-        from pylsl import StreamInlet, resolve_stream
-        print("Using standard pylsl import")
-    except ImportError:
-        try:
-            from pylsl import StreamInlet
-            from pylsl import resolve_byprop
-            print("Using alternative pylsl import")
-        except ImportError:
-            print("Error importing pylsl. Please install with: pip install pylsl")
-            sys.exit(1)
+import lsl_stream_cache
+
+from _lsl_compat import StreamInlet, cf_string, resolve_streams
 
 try:
     from djitellopy import Tello
 except ImportError:
     print("Warning: djitellopy not found. Simulation mode will be used.")
 
+try:
+    from numba import njit
+except ImportError:
+    print("numba not found. EMG processing will run as plain Python.")
+    
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that leaves the function uncompiled."""
+        return lambda func: func
+
+# Command names indexed by the codes returned from the EMG kernels
+COMMANDS = ("hover", "forward", "backward")
+
+@njit(cache=True, nogil=True)
+def _classify(value, state, enter, leave, full):
+    """Map a smoothed control value to a (command code, intensity) pair.
+    
+    A movement starts once |value| passes `enter` but only stops when it
+    falls below `leave`, so noise around the threshold can't make the
+    command flicker. Intensity is quantized to half or full speed.
+    """
+    # Your EMG signal is negative when you flex, so negative values
+    # trigger backward movement; use the absolute value for intensity
+    if value < -(leave if state == 2 else enter):
+        code = 2
+    elif value > (leave if state == 1 else enter):
+        code = 1
+    else:
+        return 0, 0.0
+    return code, 1.0 if abs(value) >= full else 0.5
+
+@njit(cache=True, nogil=True)
+def _update_and_classify(buf, buf_sum, idx, new_x, new_y, state, enter, leave, full):
+    """Store one (x, y) sample in the circular buffer and classify the result.
+    
+    buf_sum is updated in place; returns (new_idx, command code, intensity).
+    """
+    n = buf.shape[0]
+    buf_sum[0] += new_x - buf[idx, 0]
+    buf_sum[1] += new_y - buf[idx, 1]
+    buf[idx, 0] = new_x
+    buf[idx, 1] = new_y
+    
+    idx += 1
+    if idx >= n:
+        idx = 0
+        # Re-sum once per wrap so float rounding can't build up
+        buf_sum[0] = buf[:, 0].sum()
+        buf_sum[1] = buf[:, 1].sum()
+    
+    # The x-axis carries the control signal
+    code, intensity = _classify(buf_sum[0] / n, state, enter, leave, full)
+    return idx, code, intensity
+
 # Simulator class for testing without a physical drone
 class TelloSimulator:
     """Simulates basic Tello drone functions for testing."""
@@ -131,21 +159,52 @@ class TelloEMGControl:
         self.joystick_data = [0.0, 0.0]  # Initialize with neutral position
         self.emg_buffer_size = 10
         self.emg_buffer = np.zeros((self.emg_buffer_size, 2))  # Buffer for x,y values
+        self._buf_idx = 0  # Write position in the circular EMG buffer
+        self._buf_sum = np.zeros(2)  # Running per-column sum of emg_buffer
+        self._buf_scale = 1.0 / self.emg_buffer_size
+        self.enter_threshold = 0.25  # |value| needed to start moving
+        self.leave_threshold = 0.15  # |value| below which movement stops
+        self.full_speed_threshold = 0.75  # |value| for full rather than half speed
+        self._command_code = 0  # Index into COMMANDS of the current command
+        self.raw_emg_divisor = 500.0  # Adjust divisor based on signal range
         
         # Drone parameters
         self.drone = None
         self.is_flying = False
         self.speed = 30  # Drone speed (0-100)
+        self.control_period = 0.05  # Seconds between EMG drone commands (20 Hz)
+        self.emg_stall_timeout = 0.15  # Seconds without new EMG before the drone hovers
+        self._yaw = 0  # Current keyboard rotation speed, folded into EMG commands
+        self._last_rc = (0, 0, 0, 0)  # Last rc command actually sent
+        self._last_rc_time = 0.0
+        self._rc_socket = None  # djitellopy's UDP socket, for pre-encoded rc packets
+        self._rc_bytes_cache = {}  # Pre-encoded packets for the common rc commands
+        self.rc_keepalive = 0.5  # Seconds before an unchanged rc command is resent
+        self._rc_lock = RLock()  # Serializes rc sends from the keyboard and EMG threads
         
         # LSL stream parameters
         self.inlet = None
         self.stream_type = "UNKNOWN"
+        self.lsl_resolve_timeout = 10.0  # Seconds to wait for stream discovery
+        self.lsl_max_buflen = 1  # Seconds of EMG the inlet may buffer
+        self._chunk_size = 256  # Max samples pulled from the inlet per call
+        self._chunk_buf = None  # Preallocated pull_chunk() destination
+        self._sim_samples = np.empty((1024, 2), dtype=np.float32)  # Simulated EMG batch
         
         # Debug mode for testing
         self.debug_mode = True
         
         # Control flags
         self.running = True
+        self._shutdown = Event()  # Wakes the EMG commander when the program exits
+        
+        # (samples read so far, smoothed value), published by the LSL reader thread
+        self._emg_snapshot = (0, 0.0)
+        
+        # Compile the EMG kernels now (on scratch data) so the JIT cost isn't
+        # paid on the first real sample
+        _update_and_classify(np.zeros_like(self.emg_buffer), np.zeros(2), 0, 0.0, 0.0,
+                             0, *self._thresholds())
         
     def connect_to_drone(self):
         """Connect to the Tello drone."""
@@ -163,6 +222,8 @@ class TelloEMGControl:
             # Set speed
             self.drone.set_speed(self.speed)
             print(f"Drone speed set to {self.speed}")
+            
+            self._prepare_rc_packets()
             return True
         except Exception as e:
             print(f"Failed to connect to drone: {e}")
@@ -170,16 +231,44 @@ class TelloEMGControl:
             self.drone = TelloSimulator()  # Use simulator instead
             return True
             
+    def _prepare_rc_packets(self):
+        """Pre-encode the rc commands the controller sends most often.
+        
+        These are hover, rotation and EMG forward/backward at the quantized
+        speeds. send_rc() writes them straight to djitellopy's UDP socket
+        instead of formatting and encoding a new string each time.
+        """
+        # djitellopy keeps one module-level socket shared by all drones
+        from djitellopy import tello as tello_module
+        self._rc_socket = getattr(tello_module, "client_socket", None)
+        if self._rc_socket is None:
+            return
+        
+        commands = [(0, 0, 0, 0), (0, 0, 0, self.speed), (0, 0, 0, -self.speed)]
+        for level in (0.5, 1.0):
+            speed_scaled = int(self.speed * level)
+            commands += [(0, speed_scaled, 0, 0), (0, -speed_scaled, 0, 0)]
+        # Same format djitellopy's send_rc_control() uses
+        self._rc_bytes_cache = {rc: "rc {} {} {} {}".format(*rc).encode("utf-8") for rc in commands}
+    
     def connect_to_lsl_direct(self):
         """Connect directly to first available LSL stream without filtering."""
         print("Looking for ANY LSL stream...")
         
         try:
-            # Create a direct connection to any LSL stream
-            # Use the code pattern from pylsl.examples.ReceiveData
-            print("Resolving any stream...")
-            from pylsl import resolve_streams
-            streams = resolve_streams(wait_time=5.0)
+            # Try the stream from the last run first; it resolves in well under
+            # a second if it's still there, skipping the full discovery wait.
+            # A broken cache must never stop the full discovery below.
+            try:
+                streams = lsl_stream_cache.resolve_cached()
+            except Exception as e:
+                print(f"Cached stream lookup failed: {e}")
+                streams = []
+            
+            if not streams:
+                # Create a direct connection to any LSL stream
+                print("Resolving any stream...")
+                streams = resolve_streams(wait_time=self.lsl_resolve_timeout)
             
             if not streams:
                 print("No LSL streams found.")
@@ -195,8 +284,9 @@ class TelloEMGControl:
                 except Exception as e:
                     print(f"  [{i}] Error getting stream info: {e}")
             
-            # Use the first stream by default
-            self.inlet = StreamInlet(streams[0])
+            # Use the first stream by default. Keep the inlet buffer short so a
+            # stall can't leave stale EMG driving the drone
+            self.inlet = StreamInlet(streams[0], max_buflen=self.lsl_max_buflen)
             try:
                 self.stream_type = streams[0].type()
                 print(f"Connected to '{streams[0].name()}' stream of type '{self.stream_type}'")
@@ -204,12 +294,26 @@ class TelloEMGControl:
                 self.stream_type = "UNKNOWN"
                 print(f"Connected to stream (type unknown)")
             
+            # EMG control needs numeric samples
+            if streams[0].channel_format() == cf_string:
+                print("Stream carries string samples, which can't be used for EMG control.")
+                return False
+            
             # Test the connection
             print("Testing LSL stream connection...")
             sample, timestamp = self.inlet.pull_sample(timeout=5.0)
             if sample:
                 print(f"Successfully received data: {sample}")
                 
+                # Preallocate the pull_chunk() destination now that the channel
+                # count is known; pylsl writes into it directly, so its dtype
+                # has to match the inlet's C value type
+                self._chunk_buf = np.empty((self._chunk_size, len(sample)),
+                                           dtype=np.dtype(self.inlet.value_type))
+                
+                # Remember this stream for a faster connection next launch
+                lsl_stream_cache.save_stream(streams[0])
+                
                 # Determine if this is joystick data (pairs of values)
                 if len(sample) == 2:
                     print("Detected joystick-like data format. Using as EMG joystick.")
@@ -226,56 +330,137 @@ class TelloEMGControl:
             print(f"Error connecting to LSL stream: {e}")
             return False
             
+    def _buffer_runs(self, n):
+        """Split the newest of n incoming samples into contiguous buffer runs.
+        
+        Returns ([(buffer slice, chunk slice), ...], k) with at most two runs
+        (before and after the wrap), so a chunk is stored with plain slice
+        copies instead of building index arrays.
+        """
+        k = min(n, self.emg_buffer_size)
+        first = min(k, self.emg_buffer_size - self._buf_idx)
+        runs = [(slice(self._buf_idx, self._buf_idx + first), slice(n - k, n - k + first))]
+        if first < k:
+            runs.append((slice(0, k - first), slice(n - k + first, n)))
+        return runs, k
+        
+    def _advance_buffer(self, k):
+        """Move the write index past k freshly stored rows."""
+        self._buf_idx += k
+        if self._buf_idx >= self.emg_buffer_size:
+            self._buf_idx %= self.emg_buffer_size
+            # Re-sum once per wrap so float rounding in the running sum
+            # can't build up over a long session
+            self.emg_buffer.sum(axis=0, out=self._buf_sum)
+        
+    def _thresholds(self):
+        """Return the (enter, leave, full speed) thresholds for the EMG kernels."""
+        return self.enter_threshold, self.leave_threshold, self.full_speed_threshold
+        
     def process_joystick(self, joystick_data):
         """Process joystick data and return command value."""
-        # Add to buffer
-        self.emg_buffer = np.roll(self.emg_buffer, -1, axis=0)
-        self.emg_buffer[-1] = joystick_data
+        # Add to buffer and smooth with the running sum in compiled code;
+        # the x-axis carries the control signal
+        self._buf_idx, code, intensity = _update_and_classify(
+            self.emg_buffer, self._buf_sum, self._buf_idx,
+            float(joystick_data[0]), float(joystick_data[1]),
+            self._command_code, *self._thresholds())
+        self._command_code = code
+        return COMMANDS[code], intensity
         
-        # Average for smoothing
-        avg_joystick = np.mean(self.emg_buffer, axis=0)
+    def _smooth_joystick_chunk(self, chunk):
+        """Add a (samples, 2) block of joystick data to the buffer and return the smoothed control value."""
+        # Only the newest emg_buffer_size samples can survive in the buffer
+        runs, k = self._buffer_runs(len(chunk))
+        for dst, src in runs:
+            rows = self.emg_buffer[dst]
+            self._buf_sum -= rows.sum(axis=0)
+            rows[:] = chunk[src, :2]
+            self._buf_sum += rows.sum(axis=0)
+        self._advance_buffer(k)
         
         # FIXED: Use x-axis instead of y-axis for control
         # Your EMG data comes in the format [-0.42, 0.0] where the first element
         # contains the actual signal
-        x_value = avg_joystick[0]
-        
-        # Since your EMG signal is negative when you flex,
-        # we need to check for negative values to trigger backward movement
-        if x_value < -0.2:  # Backward threshold (negative values)
-            # Use the absolute value for intensity scaling
-            return "backward", min(abs(x_value), 1.0)
-        elif x_value > 0.2:  # Forward threshold (if you get positive values)
-            return "forward", min(abs(x_value), 1.0)
-        else:
-            return "hover", 0.0
-
-            
-    def process_raw_emg(self, emg_data):
-        """Process raw EMG data and return command value."""
-        # For multi-channel data, use the first channel
-        if isinstance(emg_data, (list, tuple)) and len(emg_data) > 0:
-            value = emg_data[0]
-        else:
-            value = emg_data
-            
-        # Add to buffer (reshape to store just one value)
-        self.emg_buffer = np.roll(self.emg_buffer, -1, axis=0)
-        self.emg_buffer[-1] = [0, value]  # Store in y position
+        return float(self._buf_sum[0]) * self._buf_scale
+        
+    def _classify_value(self, value):
+        """Map a smoothed control value to a command and intensity."""
+        code, intensity = _classify(value, self._command_code, *self._thresholds())
+        self._command_code = code
+        return COMMANDS[code], intensity
         
-        # Average for smoothing    
-        avg_value = np.mean(self.emg_buffer[:, 1])
+    def _smooth_raw_emg_chunk(self, chunk):
+        """Add a (samples, channels) block of raw EMG to the buffer and return the smoothed control value."""
+        # For multi-channel data, use the first channel (stored in y position)
+        runs, k = self._buffer_runs(len(chunk))
+        for dst, src in runs:
+            rows = self.emg_buffer[dst]
+            self._buf_sum -= rows.sum(axis=0)
+            rows[:, 0] = 0
+            rows[:, 1] = chunk[src, 0]
+            self._buf_sum[1] += rows[:, 1].sum()
+        self._advance_buffer(k)
         
         # Normalize to approximate joystick range
-        normalized = avg_value / 500.0  # Adjust divisor based on signal range
+        return float(self._buf_sum[1]) * self._buf_scale / self.raw_emg_divisor
+    
+    def send_rc(self, left_right, forward_backward, up_down, yaw):
+        """Send an rc command to the drone, skipping repeats of the last one.
         
-        # Apply thresholds
-        if normalized > 0.2:
-            return "forward", min(normalized, 1.0)
-        elif normalized < -0.2:
-            return "backward", min(abs(normalized), 1.0)
-        else:
-            return "hover", 0.0
+        An unchanged command is still resent every rc_keepalive seconds as a
+        heartbeat so the Tello doesn't land for lack of commands.
+        Returns True if a command was sent. Safe to call from any thread.
+        """
+        rc = (left_right, forward_backward, up_down, yaw)
+        with self._rc_lock:
+            now = time.monotonic()
+            if rc == self._last_rc and now - self._last_rc_time < self.rc_keepalive:
+                return False
+            packet = self._rc_bytes_cache.get(rc)
+            if packet is not None:
+                self._rc_socket.sendto(packet, self.drone.address)
+            else:
+                self.drone.send_rc_control(*rc)
+            self._last_rc = rc
+            self._last_rc_time = now
+            return True
+    
+    def apply_emg_command(self, command, speed_scaled):
+        """Send an EMG movement command, keeping any keyboard rotation active."""
+        # Hold the rc lock while reading _yaw so a key press can't slip in
+        # between and be overwritten with the old rotation
+        with self._rc_lock:
+            if command == "forward":
+                sent = self.send_rc(0, speed_scaled, 0, self._yaw)  # forward
+            elif command == "backward":
+                sent = self.send_rc(0, -speed_scaled, 0, self._yaw)  # backward
+            else:
+                self.send_rc(0, 0, 0, self._yaw)  # hover
+                sent = False
+        if sent:
+            print(f"EMG Command: {command.capitalize()} (speed: {speed_scaled})")
+    
+    def _raise_thread_priority(self):
+        """Ask the OS to schedule the calling thread ahead of normal threads.
+        
+        This is best-effort: real-time scheduling usually needs extra
+        privileges (e.g. CAP_SYS_NICE on Linux), and if the request is refused
+        the thread silently keeps its normal priority.
+        """
+        try:
+            if hasattr(os, "sched_setscheduler"):
+                # On Linux pid 0 means the calling thread
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(10))
+                print("EMG commander thread using real-time (SCHED_FIFO) scheduling")
+            elif sys.platform == "win32":
+                import ctypes
+                THREAD_PRIORITY_ABOVE_NORMAL = 1
+                kernel32 = ctypes.windll.kernel32
+                if kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_PRIORITY_ABOVE_NORMAL):
+                    print("EMG commander thread priority raised to above normal")
+        except (OSError, AttributeError):
+            pass
     
     def emg_control_loop(self):
         """Main loop for processing EMG and controlling the drone."""
@@ -289,21 +474,30 @@ class TelloEMGControl:
         if self.stream_type == "SIMULATION":
             print("Running in SIMULATION mode with generated EMG data")
             
-            # Create a sinusoidal pattern for smooth movement
-            start_time = time.time()
+            # Create a sinusoidal pattern for smooth movement, one sample per
+            # 200ms tick, generated a whole batch at a time
+            rng = np.random.default_rng()
+            sim_period = 0.2
+            n_sim = len(self._sim_samples)
+            sim_idx = n_sim  # Fill the first batch on the first tick
+            batch_start = 0.0
             
             while self.running:
-                # Generate sinusoidal motion with some noise
-                elapsed = time.time() - start_time
-                y_value = np.sin(elapsed * 0.5) * 0.7  # Sine wave with period of ~12 seconds
-                x_value = np.random.normal(0, 0.1)  # Add some noise on X axis
+                if sim_idx == n_sim:
+                    # Generate sinusoidal motion with some noise
+                    t_vec = batch_start + np.arange(n_sim) * sim_period
+                    self._sim_samples[:, 1] = np.sin(t_vec * 0.5) * 0.7  # Sine wave with period of ~12 seconds
+                    self._sim_samples[:, 0] = rng.standard_normal(n_sim) * 0.1  # Add some noise on X axis
+                    batch_start += n_sim * sim_period
+                    sim_idx = 0
                 
-                # Create simulated sample
-                sample = [x_value, y_value]
+                # Take the next simulated sample
+                sample = self._sim_samples[sim_idx]
+                sim_idx += 1
                 
                 # Print the data in debug mode
                 if self.debug_mode:
-                    print(f"Simulated data: {sample}")
+                    print(f"Simulated data: {sample.tolist()}")
                 
                 # Process joystick data
                 command, intensity = self.process_joystick(sample)
@@ -311,14 +505,7 @@ class TelloEMGControl:
                 
                 # Only apply control when the drone is flying
                 if self.is_flying:
-                    if command == "forward":
-                        self.drone.send_rc_control(0, speed_scaled, 0, 0)  # forward
-                        print(f"EMG Command: Forward (speed: {speed_scaled})")
-                    elif command == "backward":
-                        self.drone.send_rc_control(0, -speed_scaled, 0, 0)  # backward
-                        print(f"EMG Command: Backward (speed: {speed_scaled})")
-                    else:
-                        self.drone.send_rc_control(0, 0, 0, 0)  # hover
+                    self.apply_emg_command(command, speed_scaled)
                 
                 time.sleep(0.2)  # Update every 200ms in simulation mode
             return
@@ -326,37 +513,60 @@ class TelloEMGControl:
         # Normal LSL processing
         print("Receiving data from LSL stream... (watching for signals)")
         
+        # Process based on stream type
+        if self.stream_type == "EMGJoystick" or self._chunk_buf.shape[1] == 2:
+            smooth_chunk = self._smooth_joystick_chunk
+        else:
+            smooth_chunk = self._smooth_raw_emg_chunk
+        
+        # Reading LSL and commanding the drone run on separate threads, so a
+        # stalled pull can't delay a command and a slow send can't back up the
+        # inlet; this thread becomes the 20 Hz commander
+        reader = Thread(target=self._lsl_reader, args=(smooth_chunk,))
+        reader.daemon = True
+        reader.start()
+        
+        # Only the commander gets the raised priority; the reader spends its
+        # time blocked inside liblsl and doesn't need it
+        self._raise_thread_priority()
+        
         try:
+            last_read = 0
+            last_new = next_tick = time.monotonic()
+            command, speed_scaled = "hover", 0
+            stalled = False
             while self.running:
-                # Get data from LSL stream
-                sample, timestamp = self.inlet.pull_sample(timeout=0.1)
-                if not sample:
-                    continue
-                
-                # Print the received data in debug mode
-                if self.debug_mode:
-                    print(f"Received data: {sample}")
-                
-                # Process based on stream type
-                if self.stream_type == "EMGJoystick" or len(sample) == 2:
-                    command, intensity = self.process_joystick(sample)
-                else:
-                    command, intensity = self.process_raw_emg(sample)
+                # Wait for the next tick (don't try to catch up after a stall)
+                next_tick = max(next_tick + self.control_period, time.monotonic())
+                if self._shutdown.wait(max(next_tick - time.monotonic(), 0.0)):
+                    break
                 
-                speed_scaled = int(self.speed * intensity)
+                # Pick up the reader's latest smoothed value, if there is a new one
+                samples_read, value = self._emg_snapshot
+                now = time.monotonic()
+                if samples_read != last_read:
+                    n_samples = samples_read - last_read
+                    last_read = samples_read
+                    last_new = now
+                    stalled = False
+                    
+                    # Print the received data in debug mode
+                    if self.debug_mode:
+                        print(f"Received {n_samples} samples, smoothed value: {value:.3f}")
+                    
+                    command, intensity = self._classify_value(value)
+                    speed_scaled = int(self.speed * intensity)
+                elif now - last_new >= self.emg_stall_timeout:
+                    # The stream has stalled; don't keep flying on stale EMG
+                    if not stalled:
+                        print("No EMG data received, hovering until the stream resumes")
+                        stalled = True
+                    command, speed_scaled = "hover", 0
                 
-                # Only apply EMG control when the drone is flying
+                # Only apply EMG control when the drone is flying. The command
+                # is re-applied every tick so send_rc()'s keepalive keeps running
                 if self.is_flying:
-                    if command == "forward":
-                        self.drone.send_rc_control(0, speed_scaled, 0, 0)  # forward
-                        print(f"EMG Command: Forward (speed: {speed_scaled})")
-                    elif command == "backward":
-                        self.drone.send_rc_control(0, -speed_scaled, 0, 0)  # backward
-                        print(f"EMG Command: Backward (speed: {speed_scaled})")
-                    else:
-                        self.drone.send_rc_control(0, 0, 0, 0)  # hover
-                
-                time.sleep(0.01)  # Small delay to prevent overwhelming the CPU
+                    self.apply_emg_command(command, speed_scaled)
         except KeyboardInterrupt:
             print("EMG control loop interrupted")
             self.running = False
@@ -364,6 +574,31 @@ class TelloEMGControl:
             print(f"Error in EMG control loop: {e}")
             self.running = False
     
+    def _lsl_reader(self, smooth_chunk):
+        """Pull EMG from the inlet into the smoothing buffer as soon as it arrives.
+        
+        This is the only thread that touches the inlet and emg_buffer. It hands
+        each new smoothed value to the commander through _emg_snapshot; a single
+        attribute assignment is atomic in CPython, so no lock is needed.
+        """
+        samples_read = 0
+        try:
+            while self.running:
+                # Collect up to 10ms of samples straight into the preallocated
+                # array; the wait happens inside liblsl with the GIL released
+                _, timestamps = self.inlet.pull_chunk(
+                    timeout=0.01, max_samples=self._chunk_size, dest_obj=self._chunk_buf)
+                if not timestamps:
+                    continue
+                n_samples = len(timestamps)
+                
+                value = smooth_chunk(self._chunk_buf[:n_samples])
+                samples_read += n_samples
+                self._emg_snapshot = (samples_read, value)
+        except Exception as e:
+            print(f"Error in LSL reader: {e}")
+            self.running = False
+    
     def keyboard_control(self):
         """Handle keyboard inputs using pygame (no root required)."""
         # Initialize pygame for keyboard input
@@ -372,79 +607,94 @@ class TelloEMGControl:
         pygame.display.set_caption('Tello EMG Control')
         font = pygame.font.Font(None, 36)
         
+        # Pre-render the instructions once; only the "Flying" line ever
+        # changes, so both of its variants are rendered up front too
+        instructions = [
+            "Tello Drone EMG Control",
+            "",
+            "t - Takeoff",
+            "l - Land",
+            "r - Hold for clockwise rotation",
+            "R - Hold for counter-clockwise rotation",
+            "q - Quit program",
+            "",
+        ]
+        self._static_surface = pygame.Surface(screen.get_size())
+        for i, line in enumerate(instructions):
+            text = font.render(line, True, (255, 255, 255))
+            self._static_surface.blit(text, (20, 20 + i * 24))
+        flying_pos = (20, 20 + len(instructions) * 24)
+        flying_text = {state: font.render(f"Flying: {'Yes' if state else 'No'}", True, (255, 255, 255))
+                       for state in (False, True)}
+        
         # Draw instructions
         def draw_instructions():
-            screen.fill((0, 0, 0))
-            instructions = [
-                "Tello Drone EMG Control",
-                "",
-                "t - Takeoff",
-                "l - Land",
-                "r - Hold for clockwise rotation",
-                "R - Hold for counter-clockwise rotation",
-                "q - Quit program",
-                "",
-                f"Flying: {'Yes' if self.is_flying else 'No'}"
-            ]
-            for i, line in enumerate(instructions):
-                text = font.render(line, True, (255, 255, 255))
-                screen.blit(text, (20, 20 + i * 24))
+            screen.blit(self._static_surface, (0, 0))
+            screen.blit(flying_text[self.is_flying], flying_pos)
             pygame.display.flip()
         
-        draw_instructions()
+        # Only repaint when the window contents change
+        self._display_dirty = True
+        clock = pygame.time.Clock()
         
-        # Track rotation state
-        is_rotating_clockwise = False
-        is_rotating_counterclockwise = False
+        # Ignore takeoff/land keys until this time to prevent multiple keypresses
+        debounce_until = 0.0
         
         while self.running:
-            # Process pygame events
-            for event in pygame.event.get():
+            if self._display_dirty:
+                draw_instructions()
+                self._display_dirty = False
+            
+            # Process pygame events, sleeping in the OS (up to 10ms) until
+            # one arrives instead of spinning
+            event = pygame.event.wait(timeout=10)
+            while event.type != pygame.NOEVENT:
                 if event.type == pygame.QUIT:
                     print("Window closed. Quitting program...")
                     if self.is_flying:
                         self.drone.land()
                     self.running = False
                     break
+                
+                # Handle rotation (r / Shift+r) on press and release only; the
+                # Tello keeps executing the last rc command until told otherwise
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_r and self.is_flying:
+                    if event.mod & pygame.KMOD_SHIFT:
+                        print("Rotating counter-clockwise...")
+                        yaw = -self.speed  # yaw left
+                    else:
+                        print("Rotating clockwise...")
+                        yaw = self.speed  # yaw right
+                    with self._rc_lock:
+                        self._yaw = yaw
+                        self.send_rc(0, 0, 0, yaw)
+                elif event.type == pygame.KEYUP and event.key == pygame.K_r and self._yaw:
+                    with self._rc_lock:
+                        self._yaw = 0
+                        if self.is_flying:
+                            self.send_rc(0, 0, 0, 0)  # stop rotation
+                event = pygame.event.poll()
             
             # Get pressed keys
             keys = pygame.key.get_pressed()
+            debounced = time.monotonic() < debounce_until
             
             # Handle takeoff (t key)
-            if keys[pygame.K_t] and not self.is_flying:
+            if keys[pygame.K_t] and not self.is_flying and not debounced:
                 print("Taking off...")
                 self.drone.takeoff()
                 self.is_flying = True
-                draw_instructions()  # Update display
-                time.sleep(1)  # Prevent multiple keypresses
+                self._display_dirty = True  # Update display
+                debounce_until = time.monotonic() + 1
             
             # Handle landing (l key)
-            elif keys[pygame.K_l] and self.is_flying:
+            elif keys[pygame.K_l] and self.is_flying and not debounced:
                 print("Landing...")
                 self.drone.land()
                 self.is_flying = False
-                draw_instructions()  # Update display
-                time.sleep(1)  # Prevent multiple keypresses
-            
-            # Handle clockwise rotation (r key - continuous while pressed)
-            if keys[pygame.K_r] and self.is_flying:
-                if not is_rotating_clockwise:
-                    print("Rotating clockwise...")
-                    is_rotating_clockwise = True
-                self.drone.send_rc_control(0, 0, 0, self.speed)  # yaw right
-            elif is_rotating_clockwise:
-                self.drone.send_rc_control(0, 0, 0, 0)  # stop rotation
-                is_rotating_clockwise = False
-            
-            # Handle counter-clockwise rotation (R key / Shift+r - continuous while pressed)
-            if (keys[pygame.K_r] and keys[pygame.K_LSHIFT]) and self.is_flying:
-                if not is_rotating_counterclockwise:
-                    print("Rotating counter-clockwise...")
-                    is_rotating_counterclockwise = True
-                self.drone.send_rc_control(0, 0, 0, -self.speed)  # yaw left
-            elif is_rotating_counterclockwise:
-                self.drone.send_rc_control(0, 0, 0, 0)  # stop rotation
-                is_rotating_counterclockwise = False
+                self._yaw = 0
+                self._display_dirty = True  # Update display
+                debounce_until = time.monotonic() + 1
             
             # Handle quit (q key)
             if keys[pygame.K_q]:
@@ -454,8 +704,8 @@ class TelloEMGControl:
                 self.running = False
                 break
             
-            # Small delay to prevent CPU overuse
-            pygame.time.delay(50)  # 50ms delay (20 fps)
+            # Cap the input loop at 100 Hz to prevent CPU overuse
+            clock.tick(100)
         
         # Clean up pygame
         pygame.quit()
@@ -516,6 +766,7 @@ class TelloEMGControl:
             # Clean up
             print("Shutting down...")
             self.running = False
+            self._shutdown.set()
             if self.is_flying:
                 self.drone.land()
             if self.drone: